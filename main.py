@@ -1,20 +1,71 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import io
+import os
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
-from resume_parser import ResumeParser
+import tempfile
+from typing import Optional, List, Dict, Any, Tuple, Union
+from resume_parser import ResumeParser, shutdown_executor, warm_up
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upload validation
+ALLOWED_TYPES = frozenset({
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/msword"
+})
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
+
+def _spooled_path(file: UploadFile) -> Optional[str]:
+    """Path of an upload that has already been spooled to disk, if reachable.
+
+    The path is a /proc/<pid>/fd/<n> link to an anonymous (already deleted)
+    temp file. It only works for readers that open it with plain open();
+    readers that resolve it first (Path.resolve(), realpath) end up at the
+    deleted target and fail. The PDF and DOCX extractors both open it
+    themselves.
+    """
+    spool = file.file
+    if not (isinstance(spool, tempfile.SpooledTemporaryFile) and spool._rolled):
+        return None
+
+    # Named temp files (Windows) are opened delete-on-close and cannot be
+    # reopened by another process, so only anonymous POSIX temp files qualify
+    if isinstance(spool._file.name, str):
+        return None
+
+    spool.flush()
+
+    # Anonymous temp files are still reachable through /proc, also from the
+    # extraction worker processes. This only checks that /proc exposes the
+    # fd; it says nothing about how a consumer opens the path
+    fd_path = f"/proc/{os.getpid()}/fd/{spool.fileno()}"
+    return fd_path if os.access(fd_path, os.R_OK) else None
+
+
+async def _read_upload(file: UploadFile) -> Tuple[Union[bytes, str], int]:
+    """Return the upload as a file path (large, on-disk uploads) or bytes, plus its size"""
+    path = _spooled_path(file)
+    if path is not None:
+        # Let the PDF/DOCX readers open the file themselves rather than
+        # copying it into memory
+        return path, os.fstat(file.file.fileno()).st_size
+
+    content = await file.read()
+    return content, len(content)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Resume Parser API",
     description="AI-powered resume parsing service that extracts structured data from PDF and Word documents",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -31,6 +82,16 @@ app.add_middleware(
 # Initialize resume parser
 resume_parser = ResumeParser()
 
+@app.on_event("startup")
+async def startup():
+    """Load the NLP model before the first request"""
+    warm_up()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop the text extraction worker processes"""
+    shutdown_executor()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -51,48 +112,44 @@ async def health_check():
     }
 
 @app.post("/parse-resume")
-async def parse_resume(file: UploadFile = File(...)):
+async def parse_resume(file: UploadFile = File(...), include_raw: bool = True):
     """
     Parse resume and extract structured information
 
     Accepts: PDF, DOC, DOCX files
+    Query: include_raw=false omits the raw_text excerpt
     Returns: Structured JSON with extracted resume data
     """
     try:
         # Validate file type
-        allowed_types = [
-            "application/pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "application/msword"
-        ]
-
-        if file.content_type not in allowed_types:
+        if file.content_type not in ALLOWED_TYPES:
             raise HTTPException(
                 status_code=400,
                 detail=f"Unsupported file type: {file.content_type}. Supported types: PDF, DOC, DOCX"
             )
 
         # Validate file size (max 10MB)
-        content = await file.read()
-        if len(content) > 10 * 1024 * 1024:  # 10MB
+        source, file_size = await _read_upload(file)
+        if file_size > MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=413,
                 detail="File too large. Maximum size: 10MB"
             )
 
-        # Reset file pointer
-        await file.seek(0)
-
         # Parse resume
-        parsed_data = await resume_parser.parse_resume_file(file)
+        parsed_data = await resume_parser.parse_resume_file(
+            source, file.content_type, file.filename, include_raw
+        )
 
-        return JSONResponse(
+        # Returned as a response object so FastAPI skips jsonable_encoder and
+        # orjson serializes the parsed data directly
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
                 "message": "Resume parsed successfully",
                 "filename": file.filename,
-                "file_size": len(content),
+                "file_size": file_size,
                 "data": parsed_data
             }
         )
@@ -101,7 +158,7 @@ async def parse_resume(file: UploadFile = File(...)):
         raise
     except Exception as e:
         logger.error(f"Error parsing resume: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "status": "error",
@@ -111,11 +168,12 @@ async def parse_resume(file: UploadFile = File(...)):
         )
 
 @app.post("/parse-resume-batch")
-async def parse_resume_batch(files: List[UploadFile] = File(...)):
+async def parse_resume_batch(files: List[UploadFile] = File(...), include_raw: bool = True):
     """
     Parse multiple resumes in batch
 
     Accepts: Multiple PDF, DOC, DOCX files
+    Query: include_raw=false omits the raw_text excerpt
     Returns: Array of parsed resume data
     """
     try:
@@ -125,42 +183,44 @@ async def parse_resume_batch(files: List[UploadFile] = File(...)):
                 detail="Maximum 10 files allowed per batch"
             )
 
-        results = []
+        # At most one in-flight extraction per core, so the process pool is
+        # not oversubscribed
+        semaphore = asyncio.Semaphore(os.cpu_count() or 4)
 
-        for file in files:
+        async def parse_one(file: UploadFile) -> Dict[str, Any]:
             try:
                 # Validate file type
-                allowed_types = [
-                    "application/pdf",
-                    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    "application/msword"
-                ]
-
-                if file.content_type not in allowed_types:
-                    results.append({
+                if file.content_type not in ALLOWED_TYPES:
+                    return {
                         "filename": file.filename,
                         "status": "error",
                         "message": f"Unsupported file type: {file.content_type}"
-                    })
-                    continue
+                    }
 
                 # Parse individual file
-                parsed_data = await resume_parser.parse_resume_file(file)
+                async with semaphore:
+                    source, _ = await _read_upload(file)
+                    parsed_data = await resume_parser.parse_resume_file(
+                        source, file.content_type, file.filename, include_raw
+                    )
 
-                results.append({
+                return {
                     "filename": file.filename,
                     "status": "success",
                     "data": parsed_data
-                })
+                }
 
             except Exception as e:
-                results.append({
+                return {
                     "filename": file.filename,
                     "status": "error",
                     "message": str(e)
-                })
+                }
+
+        # Parse files concurrently so extraction runs on several cores
+        results = await asyncio.gather(*[parse_one(file) for file in files])
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -173,7 +233,7 @@ async def parse_resume_batch(files: List[UploadFile] = File(...)):
         raise
     except Exception as e:
         logger.error(f"Error in batch processing: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "status": "error",
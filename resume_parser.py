@@ -1,13 +1,23 @@
 import io
+import os
 import re
 import logging
-from typing import Dict, List, Any, Optional
+import functools
+import hashlib
+import multiprocessing
+import threading
+from typing import Dict, List, Any, Optional, Union
 import asyncio
+import heapq
+import sys
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 
 # PDF processing
 try:
-    import pdfplumber
+    import pypdfium2 as pdfium
     PDF_AVAILABLE = True
 except ImportError:
     PDF_AVAILABLE = False
@@ -28,6 +38,178 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Number of parsed results kept in the content-hash cache
+RESULT_CACHE_SIZE = 256
+
+# Precompiled patterns, built once at import time
+WS_RE = re.compile(r'\s+')
+NEWLINES_RE = re.compile(r'\n+')
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Phone formats are scanned separately: as one alternation the shorter US
+# form would shadow full international numbers
+PHONE_RES = (
+    re.compile(r'\+?1?[-.]?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}'),  # US format
+    re.compile(r'\+?\d{1,3}[-.]?\(?\d{3,4}\)?[-.]?\d{3,4}[-.]?\d{3,4}'),  # International
+    re.compile(r'\(\d{3}\)\s?\d{3}-\d{4}'),  # (123) 456-7890
+)
+LINKEDIN_RE = re.compile(r'linkedin\.com/in/([A-Za-z0-9-]+)', re.IGNORECASE)
+# Character classes are bounded so long comma-heavy lines cannot trigger
+# quadratic backtracking
+LOCATION_RE = re.compile(r'\b([A-Za-z][A-Za-z ]{0,40}),\s*([A-Za-z][A-Za-z ]{1,40})\b')
+DEGREE_RE = re.compile(
+    r'(bachelor|master|phd|doctorate|diploma|b\.tech|m\.tech|b\.sc|m\.sc|mba|bca|mca).{0,60}?(?:in|of)\s+([\w\s]{1,60})',
+    re.IGNORECASE
+)
+YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+FOUR_DIGITS_RE = re.compile(r'\d{4}')
+UNIV_RE = re.compile(r'university|college|institute|school', re.IGNORECASE)
+EXP_RE = re.compile(r'(\d+)\+?\s*(years?|yrs?)\s*of\s*experience', re.IGNORECASE)
+COMPANY_RE = re.compile(r'\bat\s+([A-Z][\w\s&.,]+(?:Inc|LLC|Corp|Ltd|Company|Co\.)?)')
+
+
+@functools.lru_cache(maxsize=1)
+def _get_nlp():
+    """Load the spaCy model once per process, keeping only the NER component"""
+    if not NLP_AVAILABLE:
+        return None
+    try:
+        nlp = spacy.load(
+            "en_core_web_sm",
+            exclude=["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+        )
+        logger.info("spaCy model loaded successfully")
+        return nlp
+    except Exception as e:
+        logger.warning(f"Could not load spaCy model: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    """Process pool for CPU-bound document text extraction.
+
+    Returns None where worker processes cannot be created (e.g. serverless
+    runtimes without /dev/shm); callers then fall back to the default
+    thread executor.
+    """
+    try:
+        # spawn: the parent already runs threads (hashing, Starlette's
+        # threadpool), and forking a multi-threaded process can deadlock
+        return ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    except (OSError, NotImplementedError) as e:
+        logger.warning(f"Process pool unavailable, extracting in threads: {e}")
+        return None
+
+
+def warm_up() -> None:
+    """Load the NLP model in the serving process ahead of the first request"""
+    _get_nlp()
+
+
+def shutdown_executor() -> None:
+    """Shut down the extraction process pool, if one was created"""
+    if _get_executor.cache_info().currsize:
+        executor = _get_executor()
+        if executor is not None:
+            executor.shutdown()
+        _get_executor.cache_clear()
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next _get_executor() call builds a new one"""
+    # Only clear the cache if it still holds this pool; a concurrent caller
+    # may already have replaced it
+    if _get_executor.cache_info().currsize and _get_executor() is executor:
+        _get_executor.cache_clear()
+    executor.shutdown(wait=False)
+
+
+async def _run_extraction(func, source: Union[bytes, str]) -> str:
+    """Run an extraction function in the process pool (or thread fallback).
+
+    A worker that dies (crash on a hostile document, OOM kill) breaks the
+    whole pool; it is then rebuilt and the extraction retried once.
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            return await loop.run_in_executor(executor, func, source)
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            if attempt:
+                raise
+            logger.warning("Extraction worker died, restarting process pool")
+
+
+def _content_digest(source: Union[bytes, str]) -> bytes:
+    """SHA-256 digest of file contents given as bytes or a path"""
+    if isinstance(source, str):
+        digest = hashlib.sha256()
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.digest()
+    return hashlib.sha256(source).digest()
+
+
+# PDFium is not thread-safe. Uncontended in process pool workers (one task
+# each), but it serializes extraction when falling back to threads
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _open_source(source: Union[bytes, str]):
+    """File path as-is, in-memory bytes wrapped in a stream"""
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+def _extract_pdf_text(source: Union[bytes, str]) -> str:
+    """Extract text from PDF bytes or path (runs in a worker process)"""
+    with _PDFIUM_LOCK:
+        return _extract_pdf_text_locked(source)
+
+
+def _extract_pdf_text_locked(source: Union[bytes, str]) -> str:
+    """Extract text from PDF bytes or path; caller must hold _PDFIUM_LOCK"""
+    text = ""
+
+    # Paths are opened here rather than handed to PDFium: pypdfium2 resolves
+    # path arguments, which breaks /proc/<pid>/fd links to deleted spool files
+    if isinstance(source, str):
+        pdf = pdfium.PdfDocument(open(source, "rb"), autoclose=True)
+    else:
+        pdf = pdfium.PdfDocument(source)
+    try:
+        for page in pdf:
+            # Release each page's native buffers before moving to the next
+            textpage = page.get_textpage()
+            try:
+                page_text = textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+            if page_text:
+                text += page_text + "\n"
+    finally:
+        pdf.close()
+
+    return text.strip()
+
+
+def _extract_docx_text(source: Union[bytes, str]) -> str:
+    """Extract text from DOCX bytes or path (runs in a worker process)"""
+    doc = docx.Document(_open_source(source))
+
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+
+    return text.strip()
+
+
 class ResumeParser:
     """Advanced resume parser with AI-powered text extraction and analysis"""
 
@@ -59,6 +241,35 @@ class ResumeParser:
             "microservices", "agile", "scrum", "kanban", "jira", "confluence", "slack", "teams"
         ]
 
+        # Skill -> category lookup
+        skill_categories = {
+            "programming_language": ["python", "java", "javascript", "c++", "php", "ruby"],
+            "framework": ["react", "angular", "django", "flask", "spring"],
+            "database": ["mysql", "mongodb", "postgresql", "redis"],
+            "cloud_devops": ["aws", "azure", "gcp", "docker", "kubernetes"],
+        }
+        self.skill_categories = {
+            skill: category
+            for category, skills in skill_categories.items()
+            for skill in skills
+        }
+
+        # Single-pass skill matcher: one alternation over all keywords, longest
+        # first so e.g. "sql server" wins over "sql", guarded so that short
+        # keywords like "r" or "go" only match as whole words
+        skills_alternation = '|'.join(
+            re.escape(skill.lower())
+            for skill in sorted(self.skills_keywords, key=len, reverse=True)
+        )
+        self._skills_re = re.compile(r'(?<![a-z0-9])(' + skills_alternation + r')(?![a-z0-9])')
+        self._skill_ids = {skill.lower(): idx for idx, skill in enumerate(self.skills_keywords)}
+
+        # Interned (display name, category) per skill id, reused in every result
+        self._skill_template = [
+            (sys.intern(skill.title()), sys.intern(self._categorize_skill(skill)))
+            for skill in self.skills_keywords
+        ]
+
         # Education keywords
         self.education_keywords = [
             "bachelor", "master", "phd", "doctorate", "diploma", "certificate", "degree",
@@ -74,38 +285,74 @@ class ResumeParser:
             "engineer", "programmer", "designer", "administrator"
         ]
 
-        # Initialize NLP model if available
-        self.nlp = None
-        if NLP_AVAILABLE:
-            try:
-                self.nlp = spacy.load("en_core_web_sm")
-                logger.info("spaCy model loaded successfully")
-            except Exception as e:
-                logger.warning(f"Could not load spaCy model: {e}")
+        # Job title matcher: an experience keyword followed by up to three
+        # words and a role noun, e.g. "senior backend software engineer"
+        self._title_re = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, self.experience_keywords)) + r')\s+'
+            r'(?:\w+\s+){0,3}?(?:engineer|developer|manager|analyst|designer|specialist)\b',
+            re.IGNORECASE
+        )
+
+
+        # LRU cache of parsed results keyed by (content digest, content type),
+        # so re-uploaded resumes skip extraction and parsing
+        self._result_cache = OrderedDict()
+
+    @property
+    def nlp(self):
+        """Shared NLP model (only PERSON entities are used), loaded on first use.
+
+        Not loaded in __init__: spawned extraction workers re-import the app
+        module, and must not each load their own copy of the model.
+        """
+        return _get_nlp()
 
-    async def parse_resume_file(self, file) -> Dict[str, Any]:
-        """Parse resume file and extract structured information"""
+    async def parse_resume_file(
+        self, source: Union[bytes, str], content_type: str, filename: str, include_raw: bool = True
+    ) -> Dict[str, Any]:
+        """Parse resume file contents (bytes, or a path to a file on disk) and extract structured information"""
         try:
-            # Extract text based on file type
-            if file.content_type == "application/pdf":
-                text = await self._extract_text_from_pdf(file)
-            elif file.content_type in [
-                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "application/msword"
-            ]:
-                text = await self._extract_text_from_docx(file)
+            # hashlib releases the GIL on large inputs, so hash off the event loop
+            loop = asyncio.get_running_loop()
+            digest = await loop.run_in_executor(None, _content_digest, source)
+            cache_key = (digest, content_type)
+
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                result, text_length = cached
             else:
-                raise ValueError(f"Unsupported file type: {file.content_type}")
-
-            # Parse extracted text
-            parsed_data = await self._parse_text(text)
+                # Extract text based on file type
+                if content_type == "application/pdf":
+                    text = await self._extract_text_from_pdf(source)
+                elif content_type in [
+                    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    "application/msword"
+                ]:
+                    text = await self._extract_text_from_docx(source)
+                else:
+                    raise ValueError(f"Unsupported file type: {content_type}")
+
+                # Parse extracted text (the cached entry keeps raw_text, so it
+                # can serve either kind of request)
+                result = await self._parse_text(text)
+                text_length = len(text)
+
+                self._result_cache[cache_key] = (result, text_length)
+                if len(self._result_cache) > RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+
+            # Per-request copy: the cached entry itself is never modified
+            parsed_data = dict(result)
+            if not include_raw:
+                parsed_data.pop("raw_text", None)
 
             # Add metadata
             parsed_data["metadata"] = {
-                "filename": file.filename,
-                "file_type": file.content_type,
+                "filename": filename,
+                "file_type": content_type,
                 "parsed_at": datetime.utcnow().isoformat(),
-                "text_length": len(text),
+                "text_length": text_length,
                 "parser_version": "1.0.0"
             }
 
@@ -115,40 +362,24 @@ class ResumeParser:
             logger.error(f"Error parsing resume file: {e}")
             raise
 
-    async def _extract_text_from_pdf(self, file) -> str:
-        """Extract text from PDF file"""
+    async def _extract_text_from_pdf(self, source: Union[bytes, str]) -> str:
+        """Extract text from PDF file contents or path"""
         if not PDF_AVAILABLE:
-            raise ImportError("pdfplumber not available. Install with: pip install pdfplumber")
+            raise ImportError("pypdfium2 not available. Install with: pip install pypdfium2")
 
         try:
-            content = await file.read()
-            text = ""
-
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-
-            return text.strip()
+            return await _run_extraction(_extract_pdf_text, source)
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
             raise
 
-    async def _extract_text_from_docx(self, file) -> str:
-        """Extract text from DOCX file"""
+    async def _extract_text_from_docx(self, source: Union[bytes, str]) -> str:
+        """Extract text from DOCX file contents or path"""
         if not DOCX_AVAILABLE:
             raise ImportError("python-docx not available. Install with: pip install python-docx")
 
         try:
-            content = await file.read()
-            doc = docx.Document(io.BytesIO(content))
-
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-
-            return text.strip()
+            return await _run_extraction(_extract_docx_text, source)
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {e}")
             raise
@@ -159,15 +390,25 @@ class ResumeParser:
         # Clean text
         cleaned_text = self._clean_text(text)
 
+        # Derived views shared by all extractors, computed once per resume
+        lower_text = cleaned_text.lower()
+        ctx = {
+            "text": cleaned_text,
+            "lower": lower_text,
+            "lines": cleaned_text.split('\n'),
+            "lines_lower": lower_text.split('\n'),
+        }
+
         # Extract different sections
         result = {
-            "personal_info": await self._extract_personal_info(cleaned_text),
-            "contact_info": await self._extract_contact_info(cleaned_text),
-            "skills": await self._extract_skills(cleaned_text),
-            "education": await self._extract_education(cleaned_text),
-            "experience": await self._extract_experience(cleaned_text),
-            "summary": await self._extract_summary(cleaned_text),
-            "raw_text": text[:1000] + "..." if len(text) > 1000 else text
+            "personal_info": await self._extract_personal_info(ctx),
+            "contact_info": await self._extract_contact_info(ctx),
+            "skills": await self._extract_skills(ctx),
+            "education": await self._extract_education(ctx),
+            "experience": await self._extract_experience(ctx),
+            "summary": await self._extract_summary(ctx),
+            # First 1000 characters; parse_resume_file drops it on request
+            "raw_text": text[:1000]
         }
 
         return result
@@ -175,20 +416,23 @@ class ResumeParser:
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\n+', '\n', text)
+        text = WS_RE.sub(' ', text)
+        text = NEWLINES_RE.sub('\n', text)
         return text.strip()
 
-    async def _extract_personal_info(self, text: str) -> Dict[str, Any]:
+    async def _extract_personal_info(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Extract personal information like name"""
 
+        text = ctx["text"]
+
         # Try to extract name from the first few lines
-        lines = text.split('\n')[:5]  # First 5 lines
+        lines = ctx["lines"][:5]  # First 5 lines
+        lines_lower = ctx["lines_lower"]
 
         name = None
-        for line in lines:
+        for i, line in enumerate(lines):
             line = line.strip()
-            if len(line) > 0 and not any(keyword in line.lower() for keyword in ['email', 'phone', 'address', 'linkedin']):
+            if len(line) > 0 and not any(keyword in lines_lower[i] for keyword in ['email', 'phone', 'address', 'linkedin']):
                 # Simple heuristic: if it's short and contains proper nouns
                 words = line.split()
                 if 2 <= len(words) <= 4 and all(word.replace('.', '').isalpha() for word in words):
@@ -209,90 +453,71 @@ class ResumeParser:
             "extracted_from": "text_analysis"
         }
 
-    async def _extract_contact_info(self, text: str) -> Dict[str, Any]:
+    async def _extract_contact_info(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Extract contact information"""
 
+        text = ctx["text"]
+
         # Email extraction
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
+        emails = EMAIL_RE.findall(text)
 
         # Phone extraction
-        phone_patterns = [
-            r'\+?1?[-.]?\(?\d{3}\)?[-.]?\d{3}[-.]?\d{4}',  # US format
-            r'\+?\d{1,3}[-.]?\(?\d{3,4}\)?[-.]?\d{3,4}[-.]?\d{3,4}',  # International
-            r'\(\d{3}\)\s?\d{3}-\d{4}',  # (123) 456-7890
-        ]
-
         phones = []
-        for pattern in phone_patterns:
-            phones.extend(re.findall(pattern, text))
+        for phone_re in PHONE_RES:
+            phones.extend(phone_re.findall(text))
 
         # LinkedIn extraction
-        linkedin_pattern = r'linkedin\.com/in/([A-Za-z0-9-]+)'
-        linkedin_matches = re.findall(linkedin_pattern, text, re.IGNORECASE)
+        linkedin_matches = LINKEDIN_RE.findall(text)
 
         # Location extraction (simple city, state pattern)
-        location_pattern = r'\b([A-Za-z\s]+),\s*([A-Za-z\s]{2,})\b'
-        locations = re.findall(location_pattern, text)
+        locations = LOCATION_RE.findall(text)
 
         return {
-            "emails": list(set(emails)),  # Remove duplicates
-            "phones": list(set(phones)),
+            "emails": list(dict.fromkeys(emails)),  # Remove duplicates, keeping first-seen order
+            "phones": list(dict.fromkeys(phones)),
             "linkedin": linkedin_matches[0] if linkedin_matches else None,
             "location": locations[0] if locations else None
         }
 
-    async def _extract_skills(self, text: str) -> Dict[str, Any]:
+    async def _extract_skills(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Extract skills from text"""
 
-        text_lower = text.lower()
-        found_skills = []
+        text_lower = ctx["lower"]
 
-        # Check for skills in our predefined list
-        for skill in self.skills_keywords:
-            if skill.lower() in text_lower:
-                # Count occurrences for relevance scoring
-                count = text_lower.count(skill.lower())
-                found_skills.append({
-                    "skill": skill.title(),
-                    "mentions": count,
-                    "category": self._categorize_skill(skill)
-                })
+        # Count occurrences of every known skill in one scan for relevance scoring
+        counts = Counter(self._skills_re.findall(text_lower))
 
-        # Sort by mentions (relevance)
-        found_skills.sort(key=lambda x: x["mentions"], reverse=True)
+        # Top 20 by mentions (relevance), ties in keyword order; only these
+        # are turned into result dicts
+        top_skills = heapq.nsmallest(
+            20, counts.items(), key=lambda item: (-item[1], self._skill_ids[item[0]])
+        )
+        found_skills = []
+        for skill, count in top_skills:
+            title, category = self._skill_template[self._skill_ids[skill]]
+            found_skills.append({
+                "skill": title,
+                "mentions": count,
+                "category": category
+            })
 
         return {
-            "technical_skills": found_skills[:20],  # Top 20 skills
-            "total_skills_found": len(found_skills)
+            "technical_skills": found_skills,
+            "total_skills_found": len(counts)
         }
 
     def _categorize_skill(self, skill: str) -> str:
         """Categorize skill into type"""
-        programming_langs = ["python", "java", "javascript", "c++", "php", "ruby"]
-        frameworks = ["react", "angular", "django", "flask", "spring"]
-        databases = ["mysql", "mongodb", "postgresql", "redis"]
-        cloud = ["aws", "azure", "gcp", "docker", "kubernetes"]
-
-        if skill.lower() in programming_langs:
-            return "programming_language"
-        elif skill.lower() in frameworks:
-            return "framework"
-        elif skill.lower() in databases:
-            return "database"
-        elif skill.lower() in cloud:
-            return "cloud_devops"
-        else:
-            return "other"
+        return self.skill_categories.get(skill.lower(), "other")
 
-    async def _extract_education(self, text: str) -> Dict[str, Any]:
+    async def _extract_education(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Extract education information"""
 
+        text = ctx["text"]
         education_info = []
 
         # Find education patterns
-        degree_pattern = r'(bachelor|master|phd|doctorate|diploma|b\.tech|m\.tech|b\.sc|m\.sc|mba|bca|mca).*?(?:in|of)\s+([\w\s]+)'
-        degree_matches = re.findall(degree_pattern, text, re.IGNORECASE)
+        degree_matches = DEGREE_RE.findall(text)
 
         for degree, field in degree_matches:
             education_info.append({
@@ -302,35 +527,33 @@ class ResumeParser:
             })
 
         # Find years
-        year_pattern = r'\b(19|20)\d{2}\b'
-        years = re.findall(year_pattern, text)
+        years = YEAR_RE.findall(text)
 
         # Find university/college names (simple heuristic)
-        university_keywords = ["university", "college", "institute", "school"]
-        lines = text.split('\n')
+        lines = ctx["lines"]
 
         universities = []
         for line in lines:
-            if any(keyword in line.lower() for keyword in university_keywords):
+            if UNIV_RE.search(line):
                 # Clean up the line
-                clean_line = re.sub(r'\d{4}', '', line).strip()
+                clean_line = FOUR_DIGITS_RE.sub('', line).strip()
                 if len(clean_line) > 5:
                     universities.append(clean_line)
 
         return {
             "degrees": education_info,
             "institutions": universities[:3],  # Top 3 institutions found
-            "graduation_years": list(set(years))
+            "graduation_years": list(dict.fromkeys(years))
         }
 
-    async def _extract_experience(self, text: str) -> Dict[str, Any]:
+    async def _extract_experience(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Extract work experience information"""
 
+        text = ctx["text"]
         experience_info = []
 
         # Find years of experience
-        exp_pattern = r'(\d+)\+?\s*(years?|yrs?)\s*of\s*experience'
-        exp_matches = re.findall(exp_pattern, text, re.IGNORECASE)
+        exp_matches = EXP_RE.findall(text)
 
         total_experience = None
         if exp_matches:
@@ -339,25 +562,18 @@ class ResumeParser:
             total_experience = max(years)
 
         # Find job titles
-        job_titles = []
-        for keyword in self.experience_keywords:
-            pattern = f'\b{keyword}\s+(\w+\s*)*(?:engineer|developer|manager|analyst|designer|specialist)'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                title = keyword + ' ' + ''.join(match).strip()
-                job_titles.append(title.title())
+        job_titles = [match.title() for match in self._title_re.findall(text)]
 
         # Find company names (heuristic: capitalized words near job titles)
         companies = []
         # This is a simplified approach - in production, you'd use NER
-        company_pattern = r'\bat\s+([A-Z][\w\s&.,]+(?:Inc|LLC|Corp|Ltd|Company|Co\.)?)'
-        company_matches = re.findall(company_pattern, text)
+        company_matches = COMPANY_RE.findall(text)
         companies.extend(company_matches)
 
         return {
             "total_years_experience": total_experience,
-            "job_titles": list(set(job_titles))[:5],
-            "companies": list(set(companies))[:5],
+            "job_titles": list(dict.fromkeys(job_titles))[:5],
+            "companies": list(dict.fromkeys(companies))[:5],
             "experience_level": self._determine_experience_level(total_experience)
         }
 
@@ -374,16 +590,17 @@ class ResumeParser:
         else:
             return "senior"
 
-    async def _extract_summary(self, text: str) -> Dict[str, Any]:
+    async def _extract_summary(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
         """Extract or generate summary"""
 
         # Look for summary/objective section
         summary_keywords = ["summary", "objective", "profile", "about"]
-        lines = text.split('\n')
+        lines = ctx["lines"]
+        lines_lower = ctx["lines_lower"]
 
         summary_text = None
-        for i, line in enumerate(lines):
-            if any(keyword in line.lower() for keyword in summary_keywords):
+        for i, line_lower in enumerate(lines_lower):
+            if any(keyword in line_lower for keyword in summary_keywords):
                 # Take next few lines as summary
                 summary_lines = lines[i+1:i+4]
                 summary_text = '\n'.join(summary_lines).strip()